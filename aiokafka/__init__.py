@@ -1,17 +1,8 @@
-__version__ = '0.6.0.dev'  # noqa
-
-from .abc import ConsumerRebalanceListener
-from .client import AIOKafkaClient
-from .consumer import AIOKafkaConsumer
-from .errors import ConsumerStoppedError, IllegalOperation
-from .producer import AIOKafkaProducer
-from .structs import (
-    TopicPartition, ConsumerRecord, OffsetAndTimestamp, OffsetAndMetadata
-)
-from .util import PY_35, ensure_future
+import sys
 
+__version__ = '0.6.0.dev'  # noqa
 
-__all__ = [
+__all__ = (
     # Clients API
     "AIOKafkaProducer",
     "AIOKafkaConsumer",
@@ -22,6 +13,64 @@ __all__ = [
     # Structs
     "ConsumerRecord", "TopicPartition", "OffsetAndTimestamp",
     "OffsetAndMetadata"
-]
+)
+
+# Public names are resolved on first access, so ``import aiokafka`` does not
+# pull in the whole client/producer/consumer machinery.
+_LAZY = {
+    "AIOKafkaClient": ("aiokafka.client", "AIOKafkaClient"),
+    "AIOKafkaProducer": ("aiokafka.producer", "AIOKafkaProducer"),
+    "AIOKafkaConsumer": ("aiokafka.consumer", "AIOKafkaConsumer"),
+    "ConsumerRebalanceListener": ("aiokafka.abc", "ConsumerRebalanceListener"),
+    "ConsumerStoppedError": ("aiokafka.errors", "ConsumerStoppedError"),
+    "IllegalOperation": ("aiokafka.errors", "IllegalOperation"),
+    "ConsumerRecord": ("aiokafka.structs", "ConsumerRecord"),
+    "TopicPartition": ("aiokafka.structs", "TopicPartition"),
+    "OffsetAndTimestamp": ("aiokafka.structs", "OffsetAndTimestamp"),
+    "OffsetAndMetadata": ("aiokafka.structs", "OffsetAndMetadata"),
+    # Backward compatibility only, not part of the public API
+    "PY_35": ("aiokafka.util", "PY_35"),
+    "ensure_future": ("aiokafka.util", "ensure_future"),
+}
+# Submodules that used to be imported eagerly, so ``aiokafka.errors`` and
+# friends keep working after a bare ``import aiokafka``
+_SUBMODULES = frozenset([
+    "abc", "client", "consumer", "errors", "producer", "structs", "util"
+])
+
+# Static type checkers treat this name as True. Not importing ``typing`` keeps
+# ``import aiokafka`` cheap.
+TYPE_CHECKING = False
+
+if TYPE_CHECKING or sys.version_info < (3, 7):
+    # Module level ``__getattr__`` (PEP 562) is only available since 3.7
+    from .abc import ConsumerRebalanceListener
+    from .client import AIOKafkaClient  # noqa: F401
+    from .consumer import AIOKafkaConsumer
+    from .errors import ConsumerStoppedError, IllegalOperation
+    from .producer import AIOKafkaProducer
+    from .structs import (
+        TopicPartition, ConsumerRecord, OffsetAndTimestamp, OffsetAndMetadata
+    )
+    # Backward compatibility only, resolved through ``_LAZY`` on 3.7+
+    from .util import PY_35, ensure_future  # noqa: F401
+else:
+    def __getattr__(name):
+        import importlib
+        if name in _SUBMODULES:
+            return importlib.import_module(__name__ + "." + name)
+        try:
+            module_name, attr = _LAZY[name]
+        except KeyError:
+            raise AttributeError(
+                "module {!r} has no attribute {!r}".format(__name__, name)
+            ) from None
+        value = getattr(importlib.import_module(module_name), attr)
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(globals()) | set(_LAZY) | _SUBMODULES)
 
-(PY_35, ensure_future, AIOKafkaClient)
+# Implementation details, not package attributes
+del sys, TYPE_CHECKING
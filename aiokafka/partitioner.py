@@ -0,0 +1,52 @@
+import random
+
+from kafka.partitioner.hashed import murmur2 as murmur2_py
+
+from aiokafka.util import NO_EXTENSIONS
+
+__all__ = ["DefaultPartitioner", "murmur2"]
+
+
+if NO_EXTENSIONS:
+    murmur2 = murmur2_py
+else:
+    try:
+        from aiokafka.record._crecords import murmur2_cython
+        murmur2 = murmur2_cython
+    except ImportError:  # pragma: no cover
+        murmur2 = murmur2_py
+
+
+class DefaultPartitioner(object):
+    """Default partitioner.
+
+    Hashes key to partition using murmur2 hashing (from java client)
+    If key is None, selects partition randomly from available,
+    or from all partitions if none are currently available.
+
+    Same as ``kafka.partitioner.default.DefaultPartitioner``, but uses the C
+    implementation of murmur2 if extensions are available.
+    """
+
+    @classmethod
+    def __call__(cls, key, all_partitions, available):
+        """
+        Get the partition corresponding to key
+
+        Arguments:
+            key (bytes): partitioning key
+            all_partitions (list): all partitions sorted by partition ID
+            available (list): available partitions in no particular order
+
+        Returns:
+            int: one of the values from all_partitions or available
+        """
+        if key is None:
+            if available:
+                return random.choice(available)
+            return random.choice(all_partitions)
+
+        idx = murmur2(key)
+        idx &= 0x7fffffff
+        idx %= len(all_partitions)
+        return all_partitions[idx]
@@ -307,6 +307,36 @@ class MessageAccumulator:
         self._closed = True
         await self.flush()
 
+    def _get_batch(self, tp):
+        """ Return the batch new messages for `tp` should be appended to,
+        creating one if there is none pending.
+        """
+        if self._closed:
+            # this can happen when producer is closing but try to send some
+            # messages in async task
+            raise ProducerClosed()
+        if self._exception is not None:
+            raise copy.copy(self._exception)
+
+        pending_batches = self._batches.get(tp)
+        if not pending_batches:
+            builder = self.create_builder()
+            return self._append_batch(builder, tp)
+        return pending_batches[-1]
+
+    def try_add_message(
+        self, tp, key, value, timestamp_ms=None, headers=[]
+    ):
+        """ Add message to batch by topic-partition without waiting.
+
+        Returns:
+            asyncio.Future that will resolved when message is delivered
+              or
+            None if the batch is full
+        """
+        batch = self._get_batch(tp)
+        return batch.append(key, value, timestamp_ms, headers=headers)
+
     async def add_message(
         self, tp, key, value, timeout, timestamp_ms=None,
         headers=[]
@@ -316,30 +346,59 @@ class MessageAccumulator:
         until batch is drained by send task
         """
         while True:
-            if self._closed:
-                # this can happen when producer is closing but try to send some
-                # messages in async task
-                raise ProducerClosed()
-            if self._exception is not None:
-                raise copy.copy(self._exception)
-
-            pending_batches = self._batches.get(tp)
-            if not pending_batches:
-                builder = self.create_builder()
-                batch = self._append_batch(builder, tp)
-            else:
-                batch = pending_batches[-1]
-
-            future = batch.append(key, value, timestamp_ms, headers=headers)
+            future = self.try_add_message(
+                tp, key, value, timestamp_ms, headers=headers)
             if future is not None:
                 return future
             # Batch is full, can't append data atm,
             # waiting until batch per topic-partition is drained
+            batch = self._batches[tp][-1]
+            start = self._loop.time()
+            await batch.wait_drain(timeout)
+            timeout -= self._loop.time() - start
+            if timeout <= 0:
+                raise KafkaTimeoutError()
+
+    async def add_messages(
+        self, tp, messages, timeout, timestamp_ms=None,
+        headers=[]
+    ):
+        """ Add several (key, value) messages to batch by topic-partition.
+        Same as calling `add_message` for each of them, but the pending batch
+        is only looked up once per batch, not once per message.
+
+        Returns:
+            list: of futures for each message in the same order
+
+        Raises:
+            KafkaTimeoutError: if the batch is not drained in `timeout`
+                seconds. Messages appended before that are still sent.
+            ProducerClosed: if the accumulator is closed.
+        """
+        futures = []
+        pos = 0
+        count = len(messages)
+        while pos < count:
+            batch = self._get_batch(tp)
+            append = batch.append
+            while pos < count:
+                key, value = messages[pos]
+                future = append(key, value, timestamp_ms, headers=headers)
+                if future is None:
+                    break
+                futures.append(future)
+                pos += 1
+            else:
+                break
+
+            # Batch is full, can't append data atm,
+            # waiting until batch per topic-partition is drained
             start = self._loop.time()
             await batch.wait_drain(timeout)
             timeout -= self._loop.time() - start
             if timeout <= 0:
                 raise KafkaTimeoutError()
+        return futures
 
     def data_waiter(self):
         """ Return waiter future that will be resolved when accumulator contain
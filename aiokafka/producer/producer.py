@@ -3,17 +3,18 @@ import logging
 import sys
 import traceback
 import warnings
+import weakref
 
-from kafka.partitioner.default import DefaultPartitioner
 from kafka.codec import has_gzip, has_snappy, has_lz4
 
 from aiokafka.client import AIOKafkaClient
 from aiokafka.errors import (
     MessageSizeTooLargeError, UnsupportedVersionError, IllegalOperation)
+from aiokafka.partitioner import DefaultPartitioner
 from aiokafka.record.legacy_records import LegacyRecordBatchBuilder
 from aiokafka.structs import TopicPartition
 from aiokafka.util import (
-    INTEGER_MAX_VALUE, PY_36, commit_structure_validate
+    INTEGER_MAX_VALUE, PY_36, commit_structure_validate, ensure_future
 )
 
 from .message_accumulator import MessageAccumulator
@@ -23,6 +24,62 @@ from .transaction_manager import TransactionManager
 log = logging.getLogger(__name__)
 
 _missing = object()
+_VALID_ACKS = frozenset([0, 1, -1, 'all', _missing])
+# Record parser/builder support only list type, no explicit None (and no
+# tuple in the C builder). Builders only read headers, so one shared empty
+# list is used instead of creating a new one per message.
+_EMPTY_HEADERS = []
+
+
+def _no_txn_verify():
+    pass
+
+
+def _make_serialize(key_serializer, value_serializer, record_overhead,
+                    max_request_size):
+    """ Build the `_serialize(topic, key, value)` function for the configured
+    serializers, so we don't check for serializers on each message. Only
+    arguments are captured, not the producer, to not create a reference cycle.
+    """
+    def serialize_bytes(topic, key, value):
+        message_size = record_overhead
+        if key is not None:
+            message_size += len(key)
+        if value is not None:
+            message_size += len(value)
+        if message_size > max_request_size:
+            raise MessageSizeTooLargeError(
+                "The message is %d bytes when serialized which is larger than"
+                " the maximum request size you have configured with the"
+                " max_request_size configuration" % message_size)
+        return key, value
+
+    if key_serializer is None and value_serializer is None:
+        return serialize_bytes
+    elif value_serializer is None:
+        def serialize(topic, key, value):
+            return serialize_bytes(topic, key_serializer(key), value)
+    elif key_serializer is None:
+        def serialize(topic, key, value):
+            return serialize_bytes(topic, key, value_serializer(value))
+    else:
+        def serialize(topic, key, value):
+            return serialize_bytes(
+                topic, key_serializer(key), value_serializer(value))
+    return serialize
+
+
+def _weak_listener(method):
+    """ Wrap a bound method, so a cluster metadata listener does not keep the
+    producer alive.
+    """
+    method_ref = weakref.WeakMethod(method)
+
+    def listener(cluster):
+        method = method_ref()
+        if method is not None:
+            method(cluster)
+    return listener
 
 
 class AIOKafkaProducer(object):
@@ -102,7 +159,10 @@ class AIOKafkaProducer(object):
             This setting accomplishes this by adding a small amount of
             artificial delay; that is, if first request is processed faster,
             than `linger_ms`, producer will wait `linger_ms - process_time`.
-            This setting defaults to 0 (i.e. no delay).
+            This setting defaults to 0 (i.e. no delay). Note, that a short
+            hold of ``min(1, linger_ms / 10)`` milliseconds (1ms if
+            ``linger_ms`` is 0) is always applied once new data arrives, so
+            messages sent concurrently are grouped into the same batch.
         partitioner (callable): Callable used to determine which partition
             each message is assigned to. Called (after key serialization):
             partitioner(key_bytes, all_partitions, available_partitions).
@@ -168,6 +228,7 @@ class AIOKafkaProducer(object):
     }
 
     _closed = None  # Serves as an uninitialized flag for __del__
+    _debug = False
     _source_traceback = None
 
     def __init__(self, *, loop, bootstrap_servers='localhost',
@@ -185,17 +246,23 @@ class AIOKafkaProducer(object):
                  sasl_plain_password=None, sasl_plain_username=None,
                  sasl_kerberos_service_name='kafka',
                  sasl_kerberos_domain_name=None):
-        if acks not in (0, 1, -1, 'all', _missing):
+        try:
+            valid_acks = acks in _VALID_ACKS
+        except TypeError:  # Unhashable value
+            valid_acks = False
+        if not valid_acks:
             raise ValueError("Invalid ACKS parameter")
-        if compression_type not in ('gzip', 'snappy', 'lz4', None):
-            raise ValueError("Invalid compression type!")
-        if compression_type:
-            checker, compression_attrs = self._COMPRESSORS[compression_type]
+        if compression_type is None:
+            compression_attrs = 0
+        else:
+            try:
+                checker, compression_attrs = \
+                    self._COMPRESSORS[compression_type]
+            except (KeyError, TypeError):
+                raise ValueError("Invalid compression type!") from None
             if not checker():
                 raise RuntimeError("Compression library for {} not found"
                                    .format(compression_type))
-        else:
-            compression_attrs = 0
 
         if transactional_id is not None:
             enable_idempotence = True
@@ -214,6 +281,9 @@ class AIOKafkaProducer(object):
         else:
             self._txn_manager = None
 
+        if transactional_id is None:
+            self._verify_txn_started = _no_txn_verify
+
         if acks is _missing:
             acks = 1
         elif acks == 'all':
@@ -230,6 +300,12 @@ class AIOKafkaProducer(object):
         self._partitioner = partitioner
         self._max_request_size = max_request_size
         self._request_timeout_ms = request_timeout_ms
+        self._request_timeout_s = request_timeout_ms / 1000
+        # Micro-linger applied before draining freshly arrived data
+        if linger_ms == 0:
+            self._awaited_linger_ms = 1
+        else:
+            self._awaited_linger_ms = min(1, linger_ms / 10)
 
         self.client = AIOKafkaClient(
             loop=loop, bootstrap_servers=bootstrap_servers,
@@ -245,38 +321,54 @@ class AIOKafkaProducer(object):
             sasl_kerberos_service_name=sasl_kerberos_service_name,
             sasl_kerberos_domain_name=sasl_kerberos_domain_name)
         self._metadata = self.client.cluster
+        # Topics known to be present in metadata and their partitions. Reset
+        # on every metadata update, so `send()` does not need to wait on
+        # metadata or rebuild partition lists each call.
+        self._fresh_topics = set()
+        self._partition_cache = {}
+        # topic -> {partition: TopicPartition}, to reuse the same instances
+        self._tp_cache = {}
+        self._metadata_listener = _weak_listener(self._on_metadata_change)
+        self._metadata.add_listener(self._metadata_listener)
         self._message_accumulator = MessageAccumulator(
             self._metadata, max_batch_size, compression_attrs,
-            self._request_timeout_ms / 1000, txn_manager=self._txn_manager,
+            self._request_timeout_s, txn_manager=self._txn_manager,
             loop=loop)
         self._sender = Sender(
             self.client, acks=acks, txn_manager=self._txn_manager,
             retry_backoff_ms=retry_backoff_ms, linger_ms=linger_ms,
             message_accumulator=self._message_accumulator,
             request_timeout_ms=request_timeout_ms,
+            awaited_linger_ms=self._awaited_linger_ms,
             loop=loop)
 
         self._loop = loop
         if loop.get_debug():
-            self._source_traceback = traceback.extract_stack(sys._getframe(1))
+            # Source lines are only read if the traceback is ever formatted
+            stack = traceback.StackSummary.extract(
+                traceback.walk_stack(sys._getframe(1)), lookup_lines=False)
+            stack.reverse()
+            self._source_traceback = stack
         self._closed = False
 
     # Warn if producer was not closed properly
     # We don't attempt to close the Consumer, as __del__ is synchronous
     def __del__(self, _warnings=warnings):
-        if self._closed is False:
-            if PY_36:
-                kwargs = {'source': self}
-            else:
-                kwargs = {}
-            _warnings.warn("Unclosed AIOKafkaProducer {!r}".format(self),
-                           ResourceWarning,
-                           **kwargs)
-            context = {'producer': self,
-                       'message': 'Unclosed AIOKafkaProducer'}
-            if self._source_traceback is not None:
-                context['source_traceback'] = self._source_traceback
-            self._loop.call_exception_handler(context)
+        if self._closed is not False:
+            # Closed properly or failed in `__init__`
+            return
+        if PY_36:
+            kwargs = {'source': self}
+        else:
+            kwargs = {}
+        _warnings.warn("Unclosed AIOKafkaProducer {!r}".format(self),
+                       ResourceWarning,
+                       **kwargs)
+        context = {'producer': self,
+                   'message': 'Unclosed AIOKafkaProducer'}
+        if self._source_traceback is not None:
+            context['source_traceback'] = self._source_traceback
+        self._loop.call_exception_handler(context)
 
     async def __aenter__(self):
         await self.start()
@@ -302,6 +394,13 @@ class AIOKafkaProducer(object):
         await self._sender.start()
         self._message_accumulator.set_api_version(self.client.api_version)
         self._producer_magic = 0 if self.client.api_version < (0, 10) else 1
+        self._serialize = _make_serialize(
+            self._key_serializer, self._value_serializer,
+            LegacyRecordBatchBuilder.record_overhead(self._producer_magic),
+            self._max_request_size)
+        # Per message debug logs are checked against this flag, not the
+        # logger, to save the call on the hot path.
+        self._debug = log.isEnabledFor(logging.DEBUG)
         log.debug("Kafka producer started")
 
     async def flush(self):
@@ -314,57 +413,77 @@ class AIOKafkaProducer(object):
             return
         self._closed = True
 
-        # If the sender task is down there is no way for accumulator to flush
-        if self._sender is not None and self._sender.sender_task is not None:
-            await asyncio.wait([
-                self._message_accumulator.close(),
-                self._sender.sender_task],
-                return_when=asyncio.FIRST_COMPLETED,
-                loop=self._loop)
-
-            await self._sender.close()
+        await self._wait_for_sender()
 
+        self._metadata.remove_listener(self._metadata_listener)
         await self.client.close()
         log.debug("The Kafka producer has closed.")
 
+    async def _wait_for_sender(self):
+        # If the sender task is down there is no way for accumulator to flush
+        sender = self._sender
+        if sender is not None and sender.sender_task is not None:
+            close_task = ensure_future(
+                self._message_accumulator.close(), loop=self._loop)
+            await asyncio.wait(
+                {close_task, sender.sender_task},
+                return_when=asyncio.FIRST_COMPLETED)
+            if not close_task.done():
+                # Sender died, so batches will never be delivered. Don't
+                # leave the flush pending forever.
+                close_task.cancel()
+
+            await sender.close()
+
+    def _on_metadata_change(self, cluster):
+        self._fresh_topics.clear()
+        self._partition_cache.clear()
+        self._tp_cache.clear()
+
+    def _topic_partition(self, topic, partition):
+        try:
+            return self._tp_cache[topic][partition]
+        except KeyError:
+            tp = TopicPartition(topic, partition)
+            self._tp_cache.setdefault(topic, {})[partition] = tp
+            return tp
+
+    async def _wait_on_metadata(self, topic):
+        # Callers check `_fresh_topics` first, so no coroutine is created for
+        # topics we already have metadata for.
+        await self.client._wait_on_metadata(topic)
+        self._fresh_topics.add(topic)
+
     async def partitions_for(self, topic):
         """Returns set of all known partitions for the topic."""
         return (await self.client._wait_on_metadata(topic))
 
-    def _serialize(self, topic, key, value):
-        if self._key_serializer:
-            serialized_key = self._key_serializer(key)
-        else:
-            serialized_key = key
-        if self._value_serializer:
-            serialized_value = self._value_serializer(value)
-        else:
-            serialized_value = value
-
-        message_size = LegacyRecordBatchBuilder.record_overhead(
-            self._producer_magic)
-        if serialized_key is not None:
-            message_size += len(serialized_key)
-        if serialized_value is not None:
-            message_size += len(serialized_value)
-        if message_size > self._max_request_size:
-            raise MessageSizeTooLargeError(
-                "The message is %d bytes when serialized which is larger than"
-                " the maximum request size you have configured with the"
-                " max_request_size configuration" % message_size)
-
-        return serialized_key, serialized_value
+    def _partitions_for_topic(self, topic):
+        """ Returns a (partition_set, all_partitions, available) tuple for
+        topic. Cached until the next metadata update.
+        """
+        try:
+            return self._partition_cache[topic]
+        except KeyError:
+            pass
+        # `partitions_for_topic` returns a new set on each call, so we can
+        # keep it for membership checks without a copy.
+        partition_set = self._metadata.partitions_for_topic(topic)
+        available = self._metadata.available_partitions_for_topic(topic)
+        result = self._partition_cache[topic] = (
+            partition_set, tuple(partition_set), tuple(available)
+        )
+        return result
 
     def _partition(self, topic, partition, key, value,
                    serialized_key, serialized_value):
+        partition_set, all_partitions, available = \
+            self._partitions_for_topic(topic)
         if partition is not None:
             assert partition >= 0
-            assert partition in self._metadata.partitions_for_topic(topic), \
-                'Unrecognized partition'
+            assert partition in partition_set, 'Unrecognized partition'
             return partition
 
-        all_partitions = list(self._metadata.partitions_for_topic(topic))
-        available = list(self._metadata.available_partitions_for_topic(topic))
         return self._partitioner(
             serialized_key, all_partitions, available)
 
@@ -416,36 +535,120 @@ class AIOKafkaProducer(object):
             'Need at least one: key or value'
 
         # first make sure the metadata for the topic is available
-        await self.client._wait_on_metadata(topic)
+        if topic not in self._fresh_topics:
+            await self._wait_on_metadata(topic)
 
-        # Ensure transaction is started and not committing
-        if self._txn_manager is not None:
-            txn_manager = self._txn_manager
-            if txn_manager.transactional_id is not None and \
-                    not self._txn_manager.is_in_transaction():
-                raise IllegalOperation(
-                    "Can't send messages while not in transaction")
+        self._verify_txn_started()
 
         if headers is not None:
             if self.client.api_version < (0, 11):
                 raise UnsupportedVersionError(
                     "Headers not supported before Kafka 0.11")
         else:
-            # Record parser/builder support only list type, no explicit None
-            headers = []
+            headers = _EMPTY_HEADERS
 
         key_bytes, value_bytes = self._serialize(topic, key, value)
         partition = self._partition(topic, partition, key, value,
                                     key_bytes, value_bytes)
 
-        tp = TopicPartition(topic, partition)
-        log.debug("Sending (key=%s value=%s) to %s", key, value, tp)
-
-        fut = await self._message_accumulator.add_message(
-            tp, key_bytes, value_bytes, self._request_timeout_ms / 1000,
-            timestamp_ms=timestamp_ms, headers=headers)
+        try:
+            tp = self._tp_cache[topic][partition]
+        except KeyError:
+            tp = self._topic_partition(topic, partition)
+        if self._debug:
+            log.debug("Sending (key=%s value=%s) to %s", key, value, tp)
+
+        # Only fall back to the waiting coroutine if the batch is full
+        message_accumulator = self._message_accumulator
+        fut = message_accumulator.try_add_message(
+            tp, key_bytes, value_bytes, timestamp_ms, headers=headers)
+        if fut is None:
+            fut = await message_accumulator.add_message(
+                tp, key_bytes, value_bytes, self._request_timeout_s,
+                timestamp_ms=timestamp_ms, headers=headers)
         return fut
 
+    async def send_many(self, topic, items, *, timestamp_ms=None,
+                        headers=None):
+        """Publish several messages to a topic.
+
+        Same as calling ``send()`` for each item, but topic metadata,
+        transaction state and headers are checked once for all items and
+        messages for the same partition are appended to the batch together.
+
+        Arguments:
+            topic (str): topic where the messages will be published
+            items (iterable): ``(key, value)`` or ``(key, value, partition)``
+                tuples. Same rules as for ``send()`` arguments apply.
+            timestamp_ms (int, optional): epoch milliseconds (from Jan 1 1970
+                UTC) to use as the timestamp of all messages. Defaults to
+                current time.
+            headers (optional): headers to set on all messages.
+
+        Returns:
+            list: of asyncio.Future objects, one per item in the same order,
+            that will be set when the message is processed
+
+        Raises:
+            kafka.KafkaTimeoutError: if we can't schedule this records (
+                pending buffer is full) in up to `request_timeout_ms`
+                milliseconds.
+            ProducerClosed: if the producer is stopped while scheduling.
+
+            Either way, messages scheduled before the error (including ones
+            for other partitions) will still be sent, but their futures are
+            not returned.
+        """
+        # first make sure the metadata for the topic is available
+        if topic not in self._fresh_topics:
+            await self._wait_on_metadata(topic)
+
+        self._verify_txn_started()
+
+        if headers is not None:
+            if self.client.api_version < (0, 11):
+                raise UnsupportedVersionError(
+                    "Headers not supported before Kafka 0.11")
+        else:
+            headers = _EMPTY_HEADERS
+
+        null_supported = self.client.api_version >= (0, 8, 1)
+        by_partition = {}
+        count = 0
+        for item in items:
+            if len(item) == 2:
+                key, value = item
+                partition = None
+            else:
+                key, value, partition = item
+            assert value is not None or null_supported, (
+                'Null messages require kafka >= 0.8.1')
+            assert not (value is None and key is None), \
+                'Need at least one: key or value'
+
+            key_bytes, value_bytes = self._serialize(topic, key, value)
+            partition = self._partition(topic, partition, key, value,
+                                        key_bytes, value_bytes)
+            try:
+                indexes, messages = by_partition[partition]
+            except KeyError:
+                indexes, messages = by_partition[partition] = ([], [])
+            indexes.append(count)
+            messages.append((key_bytes, value_bytes))
+            count += 1
+
+        futures = [None] * count
+        for partition, (indexes, messages) in by_partition.items():
+            tp = self._topic_partition(topic, partition)
+            if self._debug:
+                log.debug("Sending %d messages to %s", len(messages), tp)
+            tp_futures = await self._message_accumulator.add_messages(
+                tp, messages, self._request_timeout_s,
+                timestamp_ms=timestamp_ms, headers=headers)
+            for index, fut in zip(indexes, tp_futures):
+                futures[index] = fut
+        return futures
+
     async def send_and_wait(
         self, topic, value=None, key=None, partition=None,
         timestamp_ms=None
@@ -478,24 +681,27 @@ class AIOKafkaProducer(object):
                 delivered.
         """
         # first make sure the metadata for the topic is available
-        await self.client._wait_on_metadata(topic)
+        if topic not in self._fresh_topics:
+            await self._wait_on_metadata(topic)
         # We only validate we have the partition in the metadata here
         partition = self._partition(topic, partition, None, None, None, None)
 
-        # Ensure transaction is started and not committing
-        if self._txn_manager is not None:
-            txn_manager = self._txn_manager
-            if txn_manager.transactional_id is not None and \
-                    not self._txn_manager.is_in_transaction():
-                raise IllegalOperation(
-                    "Can't send messages while not in transaction")
+        self._verify_txn_started()
 
-        tp = TopicPartition(topic, partition)
-        log.debug("Sending batch to %s", tp)
+        tp = self._topic_partition(topic, partition)
+        if self._debug:
+            log.debug("Sending batch to %s", tp)
         future = await self._message_accumulator.add_batch(
-            batch, tp, self._request_timeout_ms / 1000)
+            batch, tp, self._request_timeout_s)
         return future
 
+    def _verify_txn_started(self):
+        # Ensure transaction is started and not committing. Replaced by a
+        # no-op in `__init__` for producers without `transactional_id`.
+        if not self._txn_manager.is_in_transaction():
+            raise IllegalOperation(
+                "Can't send messages while not in transaction")
+
     def _ensure_transactional(self):
         if self._txn_manager is None or \
                 self._txn_manager.transactional_id is None:
@@ -507,10 +713,7 @@ class AIOKafkaProducer(object):
         log.debug(
             "Beginning a new transaction for id %s",
             self._txn_manager.transactional_id)
-        await asyncio.shield(
-            self._txn_manager.wait_for_pid(),
-            loop=self._loop
-        )
+        await asyncio.shield(self._txn_manager.wait_for_pid())
         self._txn_manager.begin_transaction()
 
     async def commit_transaction(self):
@@ -519,10 +722,7 @@ class AIOKafkaProducer(object):
             "Committing transaction for id %s",
             self._txn_manager.transactional_id)
         self._txn_manager.committing_transaction()
-        await asyncio.shield(
-            self._txn_manager.wait_for_transaction_end(),
-            loop=self._loop
-        )
+        await asyncio.shield(self._txn_manager.wait_for_transaction_end())
 
     async def abort_transaction(self):
         self._ensure_transactional()
@@ -530,10 +730,7 @@ class AIOKafkaProducer(object):
             "Aborting transaction for id %s",
             self._txn_manager.transactional_id)
         self._txn_manager.aborting_transaction()
-        await asyncio.shield(
-            self._txn_manager.wait_for_transaction_end(),
-            loop=self._loop
-        )
+        await asyncio.shield(self._txn_manager.wait_for_transaction_end())
 
     def transaction(self):
         return TransactionContext(self)
@@ -554,7 +751,7 @@ class AIOKafkaProducer(object):
             "Begin adding offsets %s for consumer group %s to transaction",
             formatted_offsets, group_id)
         fut = self._txn_manager.add_offsets_to_txn(formatted_offsets, group_id)
-        await asyncio.shield(fut, loop=self._loop)
+        await asyncio.shield(fut)
 
 
 class TransactionContext:
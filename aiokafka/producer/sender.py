@@ -34,7 +34,8 @@ class Sender:
 
     def __init__(
             self, client, *, acks, txn_manager, message_accumulator,
-            retry_backoff_ms, linger_ms, request_timeout_ms, loop):
+            retry_backoff_ms, linger_ms, request_timeout_ms, loop,
+            awaited_linger_ms=0):
         self.client = client
         self._txn_manager = txn_manager
         self._acks = acks
@@ -48,6 +49,7 @@ class Sender:
         self._retry_backoff = retry_backoff_ms / 1000
         self._request_timeout_ms = request_timeout_ms
         self._linger_time = linger_ms / 1000
+        self._awaited_linger_time = awaited_linger_ms / 1000
 
     async def start(self):
         # If producer is indempotent we need to assure we have PID found
@@ -129,13 +131,14 @@ class Sender:
                         self._muted_partitions.add(tp)
                     tasks.add(task)
 
+                data_waiter = None
                 if unknown_leaders_exist:
                     # we have at least one unknown partition's leader,
                     # try to update cluster metadata and wait backoff time
                     fut = self.client.force_metadata_update()
                     waiters |= tasks.union([fut])
                 else:
-                    fut = self._message_accumulator.data_waiter()
+                    fut = data_waiter = self._message_accumulator.data_waiter()
                     waiters |= tasks.union([fut])
 
                 # wait when:
@@ -154,6 +157,14 @@ class Sender:
 
                 tasks -= done
 
+                # New data arrived. Hold the drain for a short moment, so
+                # messages sent concurrently (ex. several
+                # `ensure_future(producer.send(...))` calls) end up in the
+                # same batch instead of a batch each.
+                if data_waiter in done and self._awaited_linger_time:
+                    await asyncio.sleep(
+                        self._awaited_linger_time, loop=self._loop)
+
         except asyncio.CancelledError:
             # done tasks should never produce errors, if they are it's a bug
             for task in tasks:
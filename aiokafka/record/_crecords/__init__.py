@@ -1,7 +1,7 @@
 # util
 from .cutil import (  # noqa
     decode_varint_cython, encode_varint_cython,
-    size_of_varint_cython, crc32c_cython
+    size_of_varint_cython, crc32c_cython, murmur2_cython
 )
 # abstract
 from .memory_records import (  # noqa
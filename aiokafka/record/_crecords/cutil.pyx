@@ -156,3 +156,58 @@ def crc32c_cython(data):
     return crc
 
 # END: CRC32C C implementation
+
+
+# Murmur2 C implementation
+
+def murmur2_cython(data):
+    """ Murmur2 hash of `data`. Same as Java's
+    `org.apache.kafka.common.utils.Utils.murmur2`, but returned as an unsigned
+    32 bit integer (like `kafka.partitioner.hashed.murmur2`).
+    """
+    cdef:
+        Py_buffer buf
+        unsigned char* ptr
+        Py_ssize_t length
+        Py_ssize_t tail
+        Py_ssize_t i
+        uint32_t m = 0x5bd1e995
+        uint32_t h
+        uint32_t k
+
+    PyObject_GetBuffer(data, &buf, PyBUF_SIMPLE)
+    ptr = <unsigned char*> buf.buf
+    length = buf.len
+
+    h = <uint32_t> 0x9747b28c ^ <uint32_t> length
+    tail = length & ~3
+
+    for i in range(0, tail, 4):
+        k = (<uint32_t> ptr[i] |
+             (<uint32_t> ptr[i + 1] << 8) |
+             (<uint32_t> ptr[i + 2] << 16) |
+             (<uint32_t> ptr[i + 3] << 24))
+        k *= m
+        k ^= k >> 24
+        k *= m
+
+        h *= m
+        h ^= k
+
+    # Handle the last few bytes of the input array
+    if length - tail >= 3:
+        h ^= <uint32_t> ptr[tail + 2] << 16
+    if length - tail >= 2:
+        h ^= <uint32_t> ptr[tail + 1] << 8
+    if length - tail >= 1:
+        h ^= <uint32_t> ptr[tail]
+        h *= m
+
+    h ^= h >> 13
+    h *= m
+    h ^= h >> 15
+
+    PyBuffer_Release(&buf)
+    return h
+
+# END: Murmur2 C implementation
@@ -1,35 +1,60 @@
 import asyncio
-import shlex
+import os
 import sys
 import yaml
 import argparse
 
 
-@asyncio.coroutine
-def build(versions_file, args, *, loop):
+async def build(versions_file, args, *, loop):
 
     with open(versions_file) as f:
-        config = yaml.load(f.read())
+        config = yaml.safe_load(f)
 
+    semaphore = asyncio.Semaphore(args.parallel, loop=loop)
+    failed = False
+
+    async def run(action, version_map):
+        nonlocal failed
+        async with semaphore:
+            # Don't start new builds if one of the previous ones failed
+            if failed:
+                return None
+            cmd = [
+                'make', 'docker-{}'.format(action),
+                'IMAGE_NAME={}'.format(config['image_name']),
+                'KAFKA_VERSION={}'.format(version_map['kafka']),
+                'SCALA_VERSION={}'.format(version_map['scala']),
+            ]
+            proc = await asyncio.create_subprocess_exec(*cmd, loop=loop)
+            status = await proc.wait()
+            # Set before the semaphore is released to the next waiter
+            if status:
+                failed = True
+            return status
+
+    res = []
     for action in args.actions:
-        procs = []
-        for version_map in config['versions']:
-            args = shlex.split('make docker-{action} '
-                               'IMAGE_NAME={image_name} '
-                               'KAFKA_VERSION={kafka} '
-                               'SCALA_VERSION={scala}'.format(
-                                   action=action,
-                                   image_name=config['image_name'],
-                                   **version_map))
-            proc = yield from asyncio.create_subprocess_exec(*args, loop=loop)
-            procs.append(proc.wait())
-
-        res = yield from asyncio.gather(*procs, loop=loop)
-        if any(res):  # If any of statuses are not 0 return right away
+        # Create tasks in config order, `as_completed` would shuffle them
+        tasks = [
+            asyncio.ensure_future(run(action, version_map), loop=loop)
+            for version_map in config['versions']]
+        for fut in asyncio.as_completed(tasks, loop=loop):
+            status = await fut
+            if status is not None:
+                res.append(status)
+        if failed:  # If any of statuses are not 0 return right away
             return res
     return res
 
 
+def positive_int(value):
+    value = int(value)
+    if value < 1:
+        raise argparse.ArgumentTypeError(
+            "should be 1 or more, got {}".format(value))
+    return value
+
+
 if __name__ == '__main__':
     loop = asyncio.get_event_loop()
 
@@ -38,6 +63,9 @@ if __name__ == '__main__':
     parser.add_argument(
         'actions', metavar='action',
         nargs='+', help='Actions to take: build, push')
+    parser.add_argument(
+        '-j', '--parallel', type=positive_int, default=os.cpu_count() or 1,
+        help='Maximum number of images processed at the same time')
 
     args = parser.parse_args()
 
@@ -8,6 +8,7 @@ from kafka.common import (TopicPartition, KafkaTimeoutError,
                           NotLeaderForPartitionError,
                           LeaderNotAvailableError)
 from ._testutil import run_until_complete
+from aiokafka.errors import ProducerClosed
 from aiokafka.util import ensure_future
 from aiokafka.producer.message_accumulator import (
     MessageAccumulator, MessageBatch, BatchBuilder
@@ -330,3 +331,94 @@ class TestMessageAccumulator(unittest.TestCase):
         self.assertEqual(batch.retry_count, 3)
         self.assertFalse(ma._pending_batches)
         self.assertFalse(ma._batches)
+
+    @run_until_complete
+    async def test_try_add_message(self):
+        cluster = ClusterMetadata(metadata_max_age_ms=10000)
+        ma = MessageAccumulator(cluster, 1000, 0, 30, loop=self.loop)
+        tp0 = TopicPartition("test-topic", 0)
+
+        fut = ma.try_add_message(tp0, None, b'0123456789' * 70)
+        self.assertIsNotNone(fut)
+        self.assertEqual(len(ma._batches[tp0]), 1)
+        # Batch is full. No new batch is created, caller has to wait
+        self.assertIsNone(ma.try_add_message(tp0, None, b'0123456789' * 70))
+        self.assertEqual(len(ma._batches[tp0]), 1)
+
+        # `add_message` waits for the full batch to be drained
+        add_task = ensure_future(
+            ma.add_message(tp0, None, b'0123456789' * 70, timeout=2),
+            loop=self.loop)
+        done, _ = await asyncio.wait(
+            [add_task], timeout=0.1, loop=self.loop)
+        self.assertFalse(bool(done))
+
+        cluster.leader_for_partition = mock.Mock(return_value=0)
+        batches, _ = ma.drain_by_nodes(ignore_nodes=[])
+        self.assertEqual(batches[0][tp0]._builder._relative_offset, 1)
+        fut2 = await add_task
+        self.assertIsNot(fut2, fut)
+        self.assertEqual(len(ma._batches[tp0]), 1)
+
+    @run_until_complete
+    async def test_add_message_closed_or_failed(self):
+        cluster = ClusterMetadata(metadata_max_age_ms=10000)
+        ma = MessageAccumulator(cluster, 1000, 0, 30, loop=self.loop)
+        tp0 = TopicPartition("test-topic", 0)
+
+        class TestException(Exception):
+            pass
+
+        ma.fail_all(TestException())
+        with self.assertRaises(TestException):
+            ma.try_add_message(tp0, None, b'value')
+        with self.assertRaises(TestException):
+            await ma.add_message(tp0, None, b'value', timeout=2)
+
+        ma = MessageAccumulator(cluster, 1000, 0, 30, loop=self.loop)
+        ma._closed = True
+        with self.assertRaises(ProducerClosed):
+            ma.try_add_message(tp0, None, b'value')
+        with self.assertRaises(ProducerClosed):
+            await ma.add_message(tp0, None, b'value', timeout=2)
+
+    @run_until_complete
+    async def test_add_messages(self):
+        cluster = ClusterMetadata(metadata_max_age_ms=10000)
+        cluster.leader_for_partition = mock.Mock(return_value=0)
+        ma = MessageAccumulator(cluster, 1000, 0, 30, loop=self.loop)
+        tp0 = TopicPartition("test-topic", 0)
+
+        messages = [(None, b'value#%d' % i) for i in range(5)]
+        futures = await ma.add_messages(tp0, messages, timeout=2)
+        self.assertEqual(len(futures), 5)
+        self.assertEqual(len(ma._batches[tp0]), 1)
+        batches, _ = ma.drain_by_nodes(ignore_nodes=[])
+        batches[0][tp0].done(base_offset=10)
+        offsets = [(await fut).offset for fut in futures]
+        self.assertEqual(offsets, [10, 11, 12, 13, 14])
+
+        # Messages do not fit in one batch. Waits for drain in between
+        messages = [(None, b'0123456789' * 70), (None, b'0123456789' * 70)]
+        add_task = ensure_future(
+            ma.add_messages(tp0, messages, timeout=2), loop=self.loop)
+        done, _ = await asyncio.wait(
+            [add_task], timeout=0.1, loop=self.loop)
+        self.assertFalse(bool(done))
+        batches, _ = ma.drain_by_nodes(ignore_nodes=[])
+        batches[0][tp0].done(base_offset=20)
+        futures = await add_task
+        batches, _ = ma.drain_by_nodes(ignore_nodes=[])
+        batches[0][tp0].done(base_offset=30)
+        offsets = [(await fut).offset for fut in futures]
+        self.assertEqual(offsets, [20, 30])
+
+        # Batch is never drained
+        with self.assertRaises(KafkaTimeoutError):
+            await ma.add_messages(tp0, messages, timeout=0.1)
+        # First message was still appended
+        self.assertEqual(ma._batches[tp0][-1]._builder._relative_offset, 1)
+
+        ma._closed = True
+        with self.assertRaises(ProducerClosed):
+            await ma.add_messages(tp0, messages, timeout=2)
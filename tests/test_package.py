@@ -0,0 +1,67 @@
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+
+def run_isolated(code):
+    # Module level imports are cached, so check them in a fresh interpreter
+    subprocess.check_call([sys.executable, "-c", textwrap.dedent(code)])
+
+
+def test_from_import_public_names():
+    run_isolated("""
+        from aiokafka import (
+            AIOKafkaProducer, AIOKafkaConsumer, ConsumerRebalanceListener,
+            ConsumerStoppedError, IllegalOperation, ConsumerRecord,
+            TopicPartition, OffsetAndTimestamp, OffsetAndMetadata,
+            AIOKafkaClient
+        )
+        import aiokafka.producer, aiokafka.structs
+        assert AIOKafkaProducer is aiokafka.producer.AIOKafkaProducer
+        assert TopicPartition is aiokafka.structs.TopicPartition
+    """)
+
+
+def test_submodules_available_after_bare_import():
+    run_isolated("""
+        import aiokafka
+        assert issubclass(aiokafka.errors.KafkaTimeoutError,
+                          aiokafka.errors.KafkaError)
+        assert aiokafka.structs.TopicPartition is aiokafka.TopicPartition
+        assert (aiokafka.producer.AIOKafkaProducer is
+                aiokafka.AIOKafkaProducer)
+        for name in ["abc", "client", "consumer", "util"]:
+            getattr(aiokafka, name)
+    """)
+
+
+def test_backward_compatible_names():
+    run_isolated("""
+        from aiokafka import PY_35, ensure_future
+        import aiokafka.util
+        assert PY_35 is aiokafka.util.PY_35
+        assert ensure_future is aiokafka.util.ensure_future
+    """)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="Eager on Python<3.7")
+def test_bare_import_is_lazy():
+    run_isolated("""
+        import sys
+        import aiokafka
+        for name in ["typing", "aiokafka.client", "aiokafka.producer"]:
+            assert name not in sys.modules, name
+        assert not hasattr(aiokafka, "sys")
+        assert not hasattr(aiokafka, "TYPE_CHECKING")
+    """)
+
+
+def test_unknown_attribute():
+    import aiokafka
+    with pytest.raises(AttributeError) as exc_info:
+        aiokafka.no_such_name
+    if sys.version_info >= (3, 7):
+        # Raised by the module level ``__getattr__``, without the KeyError
+        assert exc_info.value.__suppress_context__
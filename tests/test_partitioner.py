@@ -0,0 +1,32 @@
+import pytest
+
+from kafka.partitioner.hashed import murmur2 as kafka_murmur2
+
+from aiokafka.partitioner import DefaultPartitioner, murmur2
+
+
+@pytest.mark.parametrize("bytes_payload,partition_number", [
+    (b'', 681), (b'a', 524), (b'ab', 434), (b'abc', 107),
+    (b'123456789', 566), (b'\x00 ', 742)
+])
+def test_murmur2_java_compatibility(bytes_payload, partition_number):
+    partitioner = DefaultPartitioner()
+    all_partitions = available = list(range(1000))
+    # compare with output from Kafka's
+    # org.apache.kafka.clients.producer.Partitioner
+    assert partitioner(
+        bytes_payload, all_partitions, available) == partition_number
+
+
+def test_murmur2_same_as_kafka_python():
+    for size in range(64):
+        data = bytes(range(256 - size, 256))
+        assert murmur2(data) == kafka_murmur2(data)
+    assert murmur2(bytearray(b"some key")) == kafka_murmur2(b"some key")
+
+
+def test_default_partitioner_no_key():
+    partitioner = DefaultPartitioner()
+    for _ in range(20):
+        assert partitioner(None, [0, 1, 2], [1]) == 1
+        assert partitioner(None, (0, 1, 2), ()) in (0, 1, 2)
@@ -3,10 +3,12 @@ import gc
 import json
 import pytest
 import time
+import unittest
 import weakref
 from unittest import mock
 
 from kafka.cluster import ClusterMetadata
+from kafka.protocol.metadata import MetadataResponse_v0 as MetadataResponse
 
 from ._testutil import (
     KafkaIntegrationTestCase, run_until_complete, kafka_versions
@@ -288,6 +290,33 @@ class TestKafkaProducerIntegration(KafkaIntegrationTestCase):
                 await future
         await producer.stop()
 
+    @run_until_complete
+    async def test_producer_send_many(self):
+        producer = AIOKafkaProducer(
+            loop=self.loop, bootstrap_servers=self.hosts,
+            max_batch_size=200)
+        await producer.start()
+        self.add_cleanup(producer.stop)
+
+        items = [(b'key', b'value %d' % i, i % 2) for i in range(20)]
+        items.append((b'no partition', b'value'))
+        futures = await producer.send_many(self.topic, items)
+        self.assertEqual(len(futures), len(items))
+        results = await asyncio.gather(*futures, loop=self.loop)
+        for (_, _, partition), resp in zip(items[:-1], results[:-1]):
+            self.assertEqual(resp.topic, self.topic)
+            self.assertEqual(resp.partition, partition)
+        # Order is preserved per partition
+        for partition in (0, 1):
+            offsets = [
+                resp.offset for resp in results[:-1]
+                if resp.partition == partition]
+            self.assertEqual(offsets, sorted(offsets))
+
+        with self.assertRaises(MessageSizeTooLargeError):
+            await producer.send_many(
+                self.topic, [(None, b'm' * 1048577)])
+
     @run_until_complete
     async def test_producer_send_batch(self):
         key = b'test key'
@@ -730,3 +759,101 @@ class TestKafkaProducerIntegration(KafkaIntegrationTestCase):
             await producer.send(
                 self.topic, b'msg', partition=0,
                 headers=[("type", b"Normal")])
+
+
+@pytest.mark.usefixtures('setup_test_class_serverless')
+class TestKafkaProducerMetadataCache(unittest.TestCase):
+
+    def _metadata(self, topic, partitions):
+        brokers = [(0, 'broker_1', 4567)]
+        topics = [
+            (0, topic, [(0, p, 0, [0], [0]) for p in range(partitions)])
+        ]
+        return MetadataResponse(brokers, topics)
+
+    @run_until_complete
+    async def test_producer_metadata_update_clears_caches(self):
+        producer = AIOKafkaProducer(
+            loop=self.loop, bootstrap_servers='broker_1:4567')
+        cluster = producer.client.cluster
+        self.assertIn(producer._metadata_listener, cluster._listeners)
+
+        async def mocked_call(*args, **kw):
+            return
+        producer.client._api_version = (0, 10)
+        with mock.patch.object(producer.client, 'bootstrap') as m_bootstrap, \
+                mock.patch.object(producer._sender, 'start') as m_start:
+            m_bootstrap.side_effect = mocked_call
+            m_start.side_effect = mocked_call
+            await producer.start()
+
+        cluster.update_metadata(self._metadata("topic", 2))
+        await producer.send("topic", b"value", partition=1)
+        self.assertIn("topic", producer._fresh_topics)
+        self.assertIn("topic", producer._partition_cache)
+        self.assertIn("topic", producer._tp_cache)
+        with self.assertRaises(AssertionError):
+            await producer.send("topic", b"value", partition=2)
+
+        # Topic grows. Cached partitions should not be used anymore
+        cluster.update_metadata(self._metadata("topic", 3))
+        self.assertEqual(producer._fresh_topics, set())
+        self.assertEqual(producer._partition_cache, {})
+        self.assertEqual(producer._tp_cache, {})
+
+        await producer.send("topic", b"value", partition=2)
+        self.assertIn("topic", producer._fresh_topics)
+        self.assertEqual(
+            producer._partition_cache["topic"][1], (0, 1, 2))
+
+        await producer.stop()
+        self.assertNotIn(producer._metadata_listener, cluster._listeners)
+
+    @run_until_complete
+    async def test_producer_invalid_arguments(self):
+        for acks in [122, "1", [1], {}]:
+            with self.assertRaisesRegex(ValueError, "Invalid ACKS"):
+                AIOKafkaProducer(loop=self.loop, acks=acks)
+        for compression_type in ["zip", ["gzip"]]:
+            with self.assertRaisesRegex(
+                    ValueError, "Invalid compression") as cm:
+                AIOKafkaProducer(
+                    loop=self.loop, compression_type=compression_type)
+            # No chained KeyError/TypeError in the traceback
+            self.assertTrue(cm.exception.__suppress_context__)
+
+    @run_until_complete
+    async def test_producer_unclosed_freed_without_gc(self):
+        # Producer should not be part of a reference cycle, so an unclosed
+        # one is reported as soon as the last reference goes away
+        gc.disable()
+        self.addCleanup(gc.enable)
+        messages = []
+
+        def exception_handler(loop, context):
+            # Don't keep a reference to the producer from the context
+            messages.append(context['message'])
+        self.loop.set_exception_handler(exception_handler)
+        self.addCleanup(self.loop.set_exception_handler, None)
+
+        producer = AIOKafkaProducer(
+            loop=self.loop, bootstrap_servers='broker_1:4567',
+            key_serializer=str.encode, value_serializer=str.encode)
+
+        async def mocked_call(*args, **kw):
+            return
+        producer.client._api_version = (0, 10)
+        with mock.patch.object(producer.client, 'bootstrap') as m_bootstrap, \
+                mock.patch.object(producer._sender, 'start') as m_start:
+            m_bootstrap.side_effect = mocked_call
+            m_start.side_effect = mocked_call
+            await producer.start()
+
+        producer.client.cluster.update_metadata(self._metadata("topic", 2))
+        await producer.send("topic", "value", key="key")
+
+        producer_ref = weakref.ref(producer)
+        with self.assertWarnsRegex(ResourceWarning, "Unclosed"):
+            del producer
+        self.assertIsNone(producer_ref())
+        self.assertEqual(messages, ['Unclosed AIOKafkaProducer'])
@@ -1,5 +1,10 @@
+import asyncio
+import unittest
 from unittest import mock
 
+import pytest
+from kafka.cluster import ClusterMetadata
+
 from ._testutil import (
     KafkaIntegrationTestCase, run_until_complete, kafka_versions
 )
@@ -816,3 +821,63 @@ class TestSender(KafkaIntegrationTestCase):
         batch_mock.done.assert_not_called()
         self.assertNotEqual(batch_mock.failure.call_count, 0)
         self.assertEqual(send_handler._to_reenqueue, [])
+
+
+@pytest.mark.usefixtures('setup_test_class_serverless')
+class TestSenderAwaitedLinger(unittest.TestCase):
+
+    async def _drained_after_two_appends(self, awaited_linger_ms):
+        cluster = ClusterMetadata(metadata_max_age_ms=10000)
+        cluster.leader_for_partition = mock.Mock(return_value=0)
+        ma = MessageAccumulator(cluster, 1000, 0, 30, loop=self.loop)
+        client = mock.Mock()
+        sender = Sender(
+            client, acks=1, txn_manager=None, message_accumulator=ma,
+            retry_backoff_ms=100, linger_ms=0, request_timeout_ms=40000,
+            loop=self.loop, awaited_linger_ms=awaited_linger_ms)
+
+        drained = []
+        drain_by_nodes = ma.drain_by_nodes
+
+        def mocked_drain_by_nodes(*args, **kw):
+            nodes, unknown_leaders_exist = drain_by_nodes(*args, **kw)
+            if nodes:
+                drained.append(
+                    {node_id: set(batches) for node_id, batches in
+                     nodes.items()})
+            return nodes, unknown_leaders_exist
+        ma.drain_by_nodes = mocked_drain_by_nodes
+
+        async def mocked_send_produce_req(node_id, batches):
+            for tp, batch in batches.items():
+                batch.done_noack()
+                sender._muted_partitions.remove(tp)
+            sender._in_flight.remove(node_id)
+        sender._send_produce_req = mocked_send_produce_req
+
+        await sender.start()
+        self.addCleanup(self.loop.run_until_complete, sender.close())
+
+        # Let the sender go idle, waiting for data
+        await asyncio.sleep(0.01, loop=self.loop)
+
+        tp0 = TopicPartition("test-topic", 0)
+        tp1 = TopicPartition("test-topic", 1)
+        ma.try_add_message(tp0, None, b"first")
+        # Let the sender wake up on new data before the next append
+        await asyncio.sleep(0.01, loop=self.loop)
+        ma.try_add_message(tp1, None, b"second")
+        await ma.flush()
+        return drained, tp0, tp1
+
+    @run_until_complete
+    async def test_sender_awaited_linger_groups_appends(self):
+        drained, tp0, tp1 = await self._drained_after_two_appends(
+            awaited_linger_ms=200)
+        self.assertEqual(drained, [{0: {tp0, tp1}}])
+
+    @run_until_complete
+    async def test_sender_no_awaited_linger(self):
+        drained, tp0, tp1 = await self._drained_after_two_appends(
+            awaited_linger_ms=0)
+        self.assertEqual(drained, [{0: {tp0}}, {0: {tp1}}])